@@ -1,53 +1,68 @@
-import csv
+import atexit
+import functools
 import os
-from collections import defaultdict
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Known labels of the categorical columns, fixed at import so every chunk shares the same
+# integer codes; labels outside these lists are read as missing (code -1)
+VEHICLE_TYPE_DTYPE = pd.CategoricalDtype(['Bicycle', 'Buss', 'Car', 'Motorcycle', 'Scooter', 'Truck', 'Van'])
+JUNCTION_DTYPE = pd.CategoricalDtype(['Elm Avenue/Rabbit Road', 'Hanley Highway/Westway'])
+
+# Category codes resolved once, so the analysis compares small integers instead of strings
+BICYCLE = VEHICLE_TYPE_DTYPE.categories.get_loc('Bicycle')
+BUS = VEHICLE_TYPE_DTYPE.categories.get_loc('Buss')
+SCOOTER = VEHICLE_TYPE_DTYPE.categories.get_loc('Scooter')
+TRUCK = VEHICLE_TYPE_DTYPE.categories.get_loc('Truck')
+TWO_WHEELED = [VEHICLE_TYPE_DTYPE.categories.get_loc(vehicle) for vehicle in ('Bicycle', 'Motorcycle', 'Scooter')]
+ELM_AVENUE = JUNCTION_DTYPE.categories.get_loc('Elm Avenue/Rabbit Road')
+HANLEY_HIGHWAY = JUNCTION_DTYPE.categories.get_loc('Hanley Highway/Westway')
+
+# Rows read per chunk, so memory use stays bounded however large the CSV file is
+CHUNK_SIZE = 10000
+
 
 # Task A: Input Validation
-def validate_day_input():
+def validate_int_input(prompt, low, high, range_message):
     """
-    Prompts the user for a day input and validates if it's an integer within range (1-31).
+    Prompts the user with the given text until an integer within range (low-high) is entered.
     """
     while True:
         try:
-            day = int(input("Please enter the day of the survey in the format dd: "))
-            if 1 <= day <= 31:
-                return day
-            else:
-                print("Out of range - values must be in the range 1 and 31.")
+            value = int(input(prompt))
         except ValueError:
             print("Integer required")
+            continue
+        if low <= value <= high:
+            return value
+        print(f"Out of range - {range_message}")
+
+
+def validate_day_input():
+    """
+    Prompts the user for a day input and validates if it's an integer within range (1-31).
+    """
+    return validate_int_input("Please enter the day of the survey in the format dd: ", 1, 31,
+                              "values must be in the range 1 and 31.")
 
 
 def validate_month_input():
     """
     Prompts the user for a month input and validates if it's an integer within range (1-12).
     """
-    while True:
-        try:
-            month = int(input("Please enter the month of the survey in the format MM: "))
-            if 1 <= month <= 12:
-                return month
-            else:
-                print("Out of range - values must be in the range 1 to 12.")
-        except ValueError:
-            print("Integer required")
+    return validate_int_input("Please enter the month of the survey in the format MM: ", 1, 12,
+                              "values must be in the range 1 to 12.")
 
 
 def validate_year_input():
     """
     Prompts the user for a year input and validates if it's an integer within range (2000-2024).
     """
-    while True:
-        try:
-            year = int(input("Please enter the year of the survey in the format YYYY: "))
-            if 2000 <= year <= 2024:
-                return year
-            else:
-                print("Out of range - values must range from 2000 and 2024.")
-        except ValueError:
-            print("Integer required")
+    return validate_int_input("Please enter the year of the survey in the format YYYY: ", 2000, 2024,
+                              "values must range from 2000 and 2024.")
 
 
 def validate_continue_input():
@@ -71,64 +86,97 @@ def process_csv_data(filename):
     - Total trucks
     - Total electric vehicles
     - Two-wheeled vehicles, and other requested metrics
+    Returns an iterator of DataFrame chunks of at most CHUNK_SIZE rows.
     """
     if not os.path.exists(filename):
         raise FileNotFoundError(f"File {filename} not found.")
 
-    data = []
-    with open(filename, mode='r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            data.append(row)  # Collecting rows as dictionaries into a list
-    return data
+    # Load only the columns used by the analysis; repeated labels are stored as categoricals
+    return pd.read_csv(
+        filename,
+        usecols=[
+            'JunctionName', 'timeOfDay', 'travel_Direction_in', 'travel_Direction_out',
+            'JunctionSpeedLimit', 'VehicleSpeed', 'VehicleType', 'elctricHybrid',
+        ],
+        dtype={
+            'JunctionName': JUNCTION_DTYPE,
+            'timeOfDay': str,
+            'travel_Direction_in': 'category',
+            'travel_Direction_out': 'category',
+            'VehicleType': VEHICLE_TYPE_DTYPE,
+            'elctricHybrid': 'category',
+            'VehicleSpeed': 'int32',
+            'JunctionSpeedLimit': 'int32',
+        },
+        engine='c',
+        keep_default_na=False,
+        chunksize=CHUNK_SIZE,
+    )
 
 
 def analyze_data(data, filename):
     """Analyze data and generate results."""
-    total_vehicles = len(data)
-    trucks = sum(1 for row in data if row['VehicleType'] == 'Truck')
-    electric_vehicles = sum(1 for row in data if row['elctricHybrid'] == 'True')
-    two_wheeled_vehicles = sum(1 for row in data if row['VehicleType'] in ['Bicycle', 'Motorcycle', 'Scooter'])
-    elm_buses_north = sum(
-        1 for row in data
-        if row['JunctionName'] == 'Elm Avenue/Rabbit Road' and row['travel_Direction_in'] == 'N' and row['VehicleType'] == 'Buss'
-    )
-    no_turns = sum(1 for row in data if row['travel_Direction_in'] == row['travel_Direction_out'])
-    over_speed = sum(
-        1 for row in data if int(row['VehicleSpeed']) > int(row['JunctionSpeedLimit'])
-    )
+    total_vehicles = trucks = electric_vehicles = two_wheeled_vehicles = 0
+    elm_buses_north = no_turns = over_speed = rain_hours = 0
+    elm_avenue_vehicles = hanley_highway_vehicles = elm_scooters = 0
+    # Vehicle counts indexed by hour of the day (0-23)
+    bicycle_count_per_hour = np.zeros(24, dtype=np.int64)
+    hanley_peak_hour = np.zeros(24, dtype=np.int64)
+
+    # Fold the partial counts of each chunk into the running totals
+    for chunk in data:
+        # Look up each column and build each shared mask once, then reuse them for every metric
+        vehicle_type = chunk['VehicleType'].cat.codes.to_numpy()
+        junction = chunk['JunctionName'].cat.codes.to_numpy()
+        # Recode both direction columns onto their combined labels so they can be compared by code;
+        # every label (including a blank one) is kept, as in a plain string comparison
+        directions = union_categoricals([chunk['travel_Direction_in'], chunk['travel_Direction_out']]).categories
+        direction_in = chunk['travel_Direction_in'].cat.set_categories(directions).cat.codes.to_numpy()
+        direction_out = chunk['travel_Direction_out'].cat.set_categories(directions).cat.codes.to_numpy()
+        north = directions.get_loc('N') if 'N' in directions else -1
+        # Hour from the first two characters, dropping the ':' of unpadded times like 0:40:34 (24-hour format);
+        # rows with a missing or malformed time are left out of the hourly counts
+        hour = pd.to_numeric(chunk['timeOfDay'].str.slice(0, 2).str.rstrip(':'), errors='coerce').to_numpy(dtype=float)
+        valid_hour = (hour >= 0) & (hour < 24)  # False for NaN as well
+        hour = np.where(valid_hour, hour, 0).astype(np.int64)
+        is_bicycle = vehicle_type == BICYCLE
+        at_elm = junction == ELM_AVENUE
+        at_hanley = junction == HANLEY_HIGHWAY
+
+        total_vehicles += len(chunk)
+        trucks += int(np.count_nonzero(vehicle_type == TRUCK))
+        electric_vehicles += int((chunk['elctricHybrid'] == 'True').sum())
+        two_wheeled_vehicles += int(np.count_nonzero(np.isin(vehicle_type, TWO_WHEELED)))
+        no_turns += int(np.count_nonzero(direction_in == direction_out))
+        # Compare the raw int32 arrays directly, skipping pandas index alignment
+        over_speed += int(np.count_nonzero(chunk['VehicleSpeed'].to_numpy() > chunk['JunctionSpeedLimit'].to_numpy()))
+
+        # Vehicles at specific junctions
+        elm_avenue_vehicles += int(np.count_nonzero(at_elm))
+        hanley_highway_vehicles += int(np.count_nonzero(at_hanley))
+
+        # Elm Avenue/Rabbit Road breakdowns, counted on that junction's rows only
+        elm_vehicle_type = vehicle_type[at_elm]
+        elm_scooters += int(np.count_nonzero(elm_vehicle_type == SCOOTER))
+        elm_buses_north += int(np.count_nonzero((elm_vehicle_type == BUS) & (direction_in[at_elm] == north)))
 
-    # Vehicles at specific junctions
-    elm_avenue_vehicles = sum(1 for row in data if row['JunctionName'] == 'Elm Avenue/Rabbit Road')
-    hanley_highway_vehicles = sum(1 for row in data if row['JunctionName'] == 'Hanley Highway/Westway')
+        # Per-hour counts of bicycles and of vehicles at Hanley Highway/Westway
+        bicycle_count_per_hour += np.bincount(hour[is_bicycle & valid_hour], minlength=24)
+        hanley_peak_hour += np.bincount(hour[at_hanley & valid_hour], minlength=24)
+
+        # Rain hours (assuming there's a column "Rain" that marks if it rained during the hour)
+        rain_hours += int((chunk['timeOfDay'] == 'True').sum())
 
     # Scooter percentage at Elm Avenue/Rabbit Road
-    elm_scooters = sum(1 for row in data if row['JunctionName'] == 'Elm Avenue/Rabbit Road' and row['VehicleType'] == 'Scooter')
     elm_scooter_percentage = round((elm_scooters / elm_avenue_vehicles) * 100) if elm_avenue_vehicles else 0
 
     # Bicycles per hour (Assuming each entry represents a 10-minute interval)
-    bicycle_data = [row for row in data if row['VehicleType'] == 'Bicycle']
-    bicycle_count_per_hour = defaultdict(int)
-    for row in bicycle_data:
-        hour = row.get('timeOfDay')  # Modify this if 'Time' is the wrong column name
-        if hour:
-            hour = hour.split(':')[0]  # Assuming 24-hour format
-            bicycle_count_per_hour[hour] += 1
-    avg_bicycles_per_hour = round(sum(bicycle_count_per_hour.values()) / len(bicycle_count_per_hour)) if bicycle_count_per_hour else 0
+    bicycle_hours = bicycle_count_per_hour[bicycle_count_per_hour > 0]
+    avg_bicycles_per_hour = round(int(bicycle_hours.sum()) / len(bicycle_hours)) if len(bicycle_hours) else 0
 
     # Peak hour at Hanley Highway/Westway
-    hanley_peak_hour = defaultdict(int)
-    for row in data:
-        if row['JunctionName'] == 'Hanley Highway/Westway':
-            hour = row.get('timeOfDay')
-            if hour:
-                hour = hour.split(':')[0]  # Assuming 24-hour format
-                hanley_peak_hour[hour] += 1
-    peak_hour_count = max(hanley_peak_hour.values()) if hanley_peak_hour else 0
-    peak_hours = [hour for hour, count in hanley_peak_hour.items() if count == peak_hour_count]
-
-    # Rain hours (assuming there's a column "Rain" that marks if it rained during the hour)
-    rain_hours = sum(1 for row in data if row.get('timeOfDay') == 'True')
+    peak_hour_count = hanley_peak_hour.max()
+    peak_hours = [f"{hour:02d}" for hour in np.flatnonzero(hanley_peak_hour == peak_hour_count)] if peak_hour_count else []
 
     results = {
         "CSV File Name": filename,
@@ -151,22 +199,48 @@ def analyze_data(data, filename):
     return results
 
 
+@functools.lru_cache(maxsize=32)
+def load_and_analyze(filename, mtime):
+    """
+    Loads and analyzes a CSV file, caching the results per file.
+    The file's modification time is part of the cache key, so a changed file is analyzed again.
+    """
+    # Close the chunk reader even if the analysis fails partway through
+    with process_csv_data(filename) as reader:
+        return analyze_data(reader, filename)
+
+
 # Task C: Save Results to Text File
-def save_results_to_file(outcomes, file_name="results.txt"):
+def save_results_to_file(outcomes, file_name="results.txt", fp=None):
     """
     Saves the processed outcomes to a text file and appends if the program loops.
+    If an already open text file is passed as fp, the record is written to it and flushed instead.
     """
+    lines = [
+        f"Analysis Date: {datetime.now().replace(microsecond=0).isoformat(sep=' ')}",
+        f"CSV File: {outcomes['CSV File Name']}",
+        "Traffic Analysis Results:",
+    ]
+    # Skip writing the 'CSV File Name' again
+    lines.extend(f"{key}: {value}" for key, value in outcomes.items() if key != 'CSV File Name')
+    lines.append("")
+    payload = '\n'.join(lines) + '\n'
+
+    if fp is not None:
+        fp.write(payload)
+        fp.flush()  # Hand the record to the OS before main reports it as saved
+        return
+
+    # Write the whole record in one call
     with open(file_name, mode='a') as file:
-        file.write(f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        file.write(f"CSV File: {outcomes['CSV File Name']}\n")  # Corrected line to output the file name
-        file.write("Traffic Analysis Results:\n")
-        for key, value in outcomes.items():
-            if key != 'CSV File Name':  # Skip writing the 'CSV File Name' again
-                file.write(f"{key}: {value}\n")
-        file.write("\n")
+        file.write(payload)
 
 
 def main():
+    # Keep the results file open for the whole session instead of reopening it for every dataset
+    results_fp = open("results.txt", mode='a')
+    atexit.register(results_fp.close)
+
     while True:
         # Task A: Input Validation
         day = validate_day_input()
@@ -179,8 +253,8 @@ def main():
 
         # Load and analyze data (Tasks B and C)
         try:
-            data = process_csv_data(date_input)
-            results = analyze_data(data, date_input)  # Use date_input as filename
+            mtime = os.path.getmtime(date_input) if os.path.exists(date_input) else None
+            results = load_and_analyze(date_input, mtime)  # Use date_input as filename
 
             # Display results
             print("\nAnalysis Results:")
@@ -188,7 +262,7 @@ def main():
                 print(f"{key}: {value}")
 
             # Save results to file
-            save_results_to_file(results)
+            save_results_to_file(results, fp=results_fp)
             print("\nResults saved to 'results.txt'")
 
         except FileNotFoundError as e:
@@ -1,9 +1,22 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import csv
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib
+import functools
+from collections import defaultdict
+from itertools import chain
+
+
+@functools.cache
+def load_pyplot():
+    """
+    Imports matplotlib and seaborn on first use and returns pyplot, so they are not loaded before a file is chosen.
+    The seaborn style is set once for every histogram drawn in the session.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style="whitegrid")
+    return plt
 
 
 class HistogramApp:
@@ -13,6 +26,7 @@ class HistogramApp:
         """
         self.traffic_data = traffic_data  # Dictionary of {Hour: {Junction: Volume}}
         self.date = date
+        self._title = f"Traffic Data for {date}"  # Formatted once, reused on every redraw
 
     def draw_histogram(self):
         """
@@ -22,14 +36,13 @@ class HistogramApp:
             messagebox.showerror("No Data", "No traffic data available for visualization.")
             return
 
+        plt = load_pyplot()
+
         # Prepare data for histogram
         hours = sorted(self.traffic_data.keys())
         junctions = {junction for hour_data in self.traffic_data.values() for junction in hour_data.keys()}
         junctions = sorted(junctions)
 
-        # Set seaborn style
-        sns.set(style="whitegrid")
-
         # Set up the plot
         fig, ax = plt.subplots(figsize=(12, 7))
         bar_width = 0.1
@@ -37,17 +50,16 @@ class HistogramApp:
         # Corrected colormap usage
         colors = plt.get_cmap('tab10', len(junctions))
 
-        # Plot bars for each junction
-        for i, hour in enumerate(hours):
-            for j, junction in enumerate(junctions):
-                volume = self.traffic_data[hour].get(junction, 0)
-                ax.bar(
-                    i + j * bar_width,
-                    volume,
-                    width=bar_width,
-                    label=f'{junction}' if i == 0 else "",
-                    color=colors(j),
-                )
+        # Plot all the bars of each junction in one call, one bar per hour
+        for j, junction in enumerate(junctions):
+            volumes = [self.traffic_data[hour].get(junction, 0) for hour in hours]
+            ax.bar(
+                [i + j * bar_width for i in range(len(hours))],
+                volumes,
+                width=bar_width,
+                label=junction,
+                color=colors(j),
+            )
 
         # Add x-axis labels for hours
         ax.set_xticks([i + (len(junctions) - 1) * bar_width / 2 for i in range(len(hours))])
@@ -56,7 +68,7 @@ class HistogramApp:
         # Labels and title
         ax.set_xlabel("Hours of the Day", fontsize=12)
         ax.set_ylabel("Traffic Volume", fontsize=12)
-        ax.set_title(f"Traffic Data for {self.date}", fontsize=16)
+        ax.set_title(self._title, fontsize=16)
 
         # Display legend
         ax.legend(title="Junctions", bbox_to_anchor=(1.05, 1), loc='upper left', frameon=False)
@@ -74,13 +86,12 @@ class MultiCSVProcessor:
         """
         Initializes the application for processing multiple CSV files.
         """
-        self.current_data = None  # Stores the data for the current CSV file
         self.date = None  # Selected date for analysis
-        self.traffic_summary = {}  # Summary of traffic data
+        self.traffic_summary = defaultdict(lambda: defaultdict(int))  # Summary of traffic data
 
     def load_csv_file(self):
         """
-        Loads a CSV file and processes its data.
+        Loads a CSV file and summarises its traffic data for the selected date in a single pass.
         """
         file_path = filedialog.askopenfilename(
             title="Select Traffic Data CSV File",
@@ -91,62 +102,52 @@ class MultiCSVProcessor:
             return
 
         try:
+            multiple_dates = False
             with open(file_path, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                self.current_data = list(reader)
-
-            if not self.current_data:
-                raise ValueError("CSV file is empty.")
-
-            # Extract unique dates and process only the first date
-            dates = {row['Date'] for row in self.current_data}
-            self.date = next(iter(dates))  # Pick the first available date
-            if len(dates) > 1:
+                reader = (row for row in csv.reader(file) if row)  # Skip blank lines, as DictReader did
+                header = next(reader, [])
+
+                first_row = next(reader, None)
+                if first_row is None:
+                    raise ValueError("CSV file is empty.")
+
+                # Look up the column positions once; rows are then plain lists indexed by position
+                columns = {name: index for index, name in enumerate(header)}
+                date_col = columns['Date']
+                time_col = columns['timeOfDay']
+                junction_col = columns['JunctionName']
+                self.date = first_row[date_col]  # Pick the first available date
+
+                # Summarise the rows as they are read, processing only the first date
+                for row in chain([first_row], reader):
+                    if row[date_col] != self.date:
+                        multiple_dates = True
+                        continue
+
+                    # Extract hour from timeOfDay
+                    try:
+                        hour = int(row[time_col][:2].rstrip(':'))  # Hour part, also for unpadded times like 0:40:34
+                    except ValueError:
+                        messagebox.showerror("Invalid Data", f"Invalid timeOfDay value: {row[time_col]}")
+                        return
+
+                    junction = row[junction_col]
+                    if not junction:
+                        messagebox.showerror("Missing Data", "JunctionName is missing in the dataset.")
+                        return
+
+                    # Count vehicle occurrences, incrementing volume (1 vehicle per row)
+                    self.traffic_summary[hour][junction] += 1
+
+            if multiple_dates:
                 messagebox.showwarning("Multiple Dates", "The file contains multiple dates. Using the first date.")
-
-            self.process_data()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file: {e}")
 
-    def process_data(self):
-        """
-        Processes the traffic data for the selected date and prepares a summary.
-        """
-        if not self.current_data or not self.date:
-            return
-
-        self.traffic_summary.clear()  # Clear previous data
-
-        for row in self.current_data:
-            if row['Date'] != self.date:
-                continue
-
-            # Extract hour from timeOfDay
-            try:
-                hour = int(row['timeOfDay'].split(':')[0])  # Extracting hour part
-            except (KeyError, ValueError):
-                messagebox.showerror("Invalid Data", f"Invalid timeOfDay value: {row.get('timeOfDay')}")
-                return
-
-            junction = row.get('JunctionName', 'Unknown')
-            if not junction:
-                messagebox.showerror("Missing Data", "JunctionName is missing in the dataset.")
-                return
-
-            # Count vehicle occurrences
-            if hour not in self.traffic_summary:
-                self.traffic_summary[hour] = {}
-            if junction not in self.traffic_summary[hour]:
-                self.traffic_summary[hour][junction] = 0
-
-            # Increment volume (1 vehicle per row)
-            self.traffic_summary[hour][junction] += 1
-
     def clear_previous_data(self):
         """
         Clears data from the previous run to process a new dataset.
         """
-        self.current_data = None
         self.date = None
         self.traffic_summary.clear()
 